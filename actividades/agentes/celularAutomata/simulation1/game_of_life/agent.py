@@ -2,7 +2,11 @@
 from mesa.discrete_space import FixedAgent
 
 class Cell(FixedAgent):
-    """Represents a single ALIVE or DEAD cell in the simulation."""
+    """Represents a single ALIVE or DEAD cell in the simulation.
+
+    The cell is a view on the model state array; the model updates
+    every cell at once in its step.
+    """
 
     DEAD = 0
     ALIVE = 1
@@ -15,6 +19,15 @@ class Cell(FixedAgent):
     def y(self):
         return self.cell.coordinate[1]
 
+    @property
+    def state(self):
+        # Stored in the model state array, so all cells swap at once
+        return self.model.state[self.pos]
+
+    @state.setter
+    def state(self, value):
+        self.model.state[self.pos] = value
+
     @property
     def is_alive(self):
         return self.state == self.ALIVE
@@ -29,64 +42,3 @@ class Cell(FixedAgent):
         self.cell = cell
         self.pos = cell.coordinate
         self.state = init_state
-        self._next_state = None
-
-    def determine_state(self):
-        """Compute if the cell will be dead or alive at the next tick.  This is
-        based on the number of alive or dead neighbors.  The state is not
-        changed here, but is just computed and stored in self._nextState,
-        because our current state may still be necessary for our neighbors
-        to calculate their next state.
-        """
-
-        # Get grid width and height
-        width = self.model.grid.width
-        height = self.model.grid.height
-
-        # Get the grid positions for the top left, middle, and right neighbors
-        # % width/height is used to get correct positions in a toroidal grid
-        left_pos = (self.pos[0] - 1) % width, (self.pos[1] + 1) % height
-        top_pos = self.pos[0], (self.pos[1] + 1) % height
-        right_pos = (self.pos[0] + 1) % width, (self.pos[1] + 1) % height
-
-        # Initialize top neighbor states
-        left = 0
-        top = 0
-        right = 0
-
-        # Get the neighbors state at the top positions
-        for neighbor in self.neighbors:
-            if neighbor.pos == left_pos:
-                left = neighbor.is_alive
-            if neighbor.pos == top_pos:
-                top = neighbor.is_alive
-            if neighbor.pos == right_pos:
-                right = neighbor.is_alive
-
-        # Assume nextState is unchanged, unless changed below.
-        self._next_state = self.state
-
-        # Conditions for simulation 1
-        # If the top neighbors are in the bottom row, keep the same state
-        # This prevents cells from repeating the simulation indefinitely
-        if not self.is_alive and (left_pos[1] != 0 or top_pos[1] != 0 or right_pos[1] != 0):
-            if left and top and right: # 111
-                self._next_state = self.DEAD
-            elif left and top and not right: # 110
-                self._next_state = self.ALIVE
-            elif left and not top and right: # 101
-                self._next_state = self.DEAD
-            elif left and not top and not right: # 100
-                self._next_state = self.ALIVE
-            elif not left and top and right: # 011
-                self._next_state = self.ALIVE
-            elif not left and top and not right: # 010
-                self._next_state = self.DEAD
-            elif not left and not top and right: # 001
-                self._next_state = self.ALIVE
-            elif not left and not top and not right: # 000
-                self._next_state = self.DEAD
-
-    def assume_state(self):
-        """Set the state to the new computed state -- computed in step()."""
-        self.state = self._next_state
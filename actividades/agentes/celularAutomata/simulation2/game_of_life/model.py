@@ -1,7 +1,20 @@
+import numpy as np
 from mesa import Model
 from mesa.discrete_space import OrthogonalMooreGrid
 from .agent import Cell
 
+# Next state for every (left, top, right) pattern, indexed by
+# (left << 2) | (top << 1) | right
+#                  000 001 010 011 100 101 110 111
+RULE_LUT = np.array([0, 1, 0, 1, 1, 0, 1, 0], dtype=np.uint8)
+
+# (out, in) slice pairs that line up every index of an axis with the index
+# one step behind or ahead of it, wrapping around like the toroidal grid.
+# out[o] = src[i] for each pair does what np.roll does, without a copy.
+BEHIND = ((slice(1, None), slice(None, -1)), (slice(None, 1), slice(-1, None)))
+SAME = ((slice(None), slice(None)),)
+AHEAD = ((slice(None, -1), slice(1, None)), (slice(-1, None), slice(None, 1)))
+
 
 class ConwaysGameOfLife(Model):
     """Represents the 2-dimensional array of cells in Conway's Game of Life."""
@@ -21,6 +34,9 @@ class ConwaysGameOfLife(Model):
         """
         self.grid = OrthogonalMooreGrid((width, height), capacity=1, torus=True)
 
+        # State of every cell, indexed by [x, y] like the grid coordinates
+        self.state = np.zeros((width, height), dtype=np.uint8)
+
         # Place a cell at each location, with some initialized to
         # ALIVE and some to DEAD.
         for cell in self.grid.all_cells:
@@ -34,13 +50,40 @@ class ConwaysGameOfLife(Model):
                 ),
             )
 
+        # Buffer for the next tick, swapped with self.state after each step
+        self.next_state = np.empty_like(self.state)
+
+        # Scratch buffer for the RULE_LUT index of every cell
+        self._index = np.empty_like(self.state)
+
         self.running = True
 
     def step(self):
-        """Perform the model step in two stages:
+        """Advance all cells at once into next_state, then swap the buffers."""
+        self._step_lut()
+        self.state, self.next_state = self.next_state, self.state
+
+    def _step_lut(self):
+        """Advance all cells by looking up their neighbors in RULE_LUT.
 
-        - First, all cells assume their next state (whether they will be dead or alive)
-        - Then, all cells change state to their next state.
+        The top left, middle, and right neighbors of every cell are
+        read through wrapping slices (toroidal, like the grid itself) and
+        packed into a preallocated index buffer, so no grid is copied.
         """
-        self.agents.do("determine_state")
-        self.agents.do("assume_state")
+        state = self.state
+        index = self._index
+
+        # Neighbor states at (x - 1, y + 1), (x, y + 1) and (x + 1, y + 1),
+        # packed in place as (left << 2) | (top << 1) | right
+        for x_out, x_in in BEHIND:
+            for y_out, y_in in AHEAD:
+                index[x_out, y_out] = state[x_in, y_in]
+        for x_pairs in (SAME, AHEAD):
+            index <<= 1
+            for x_out, x_in in x_pairs:
+                for y_out, y_in in AHEAD:
+                    index[x_out, y_out] |= state[x_in, y_in]
+
+        # Conditions for simulation 2
+        # Always update state based on neighbors
+        np.take(RULE_LUT, index, out=self.next_state)
@@ -6,8 +6,9 @@ Diego Córdova Rodríguez, A01781166
 """
 
 from mesa.discrete_space import CellAgent, FixedAgent
-from collections import deque # Utilized for finding nearest unvisited cell
-import heapq # Utilized for A* algorithm
+from scipy.sparse.csgraph import dijkstra # Utilized for finding nearest unvisited cell
+import numpy as np
+from collections import deque # Utilized for A* algorithm
 
 class Roomba(CellAgent):
     """
@@ -21,10 +22,10 @@ class Roomba(CellAgent):
         stationCell: Cell where the charging station is located
         state: Current state of the Roomba
         battery: Current battery level
-        visited_cells: Set of coordinates of visited cells
+        visited: Boolean mask of visited cells, indexed by [x, y]
         trash_known_cells: Set of coordinates of known trash cells
-        pathToStation: List of coordinates forming the path to the station
-        distance_to_station: Chebyshev distance to the station
+        pathToUnvisited: Last path returned by pathToNearestUnvisited
+        distance_to_station: Path distance to the station
         steps: Number of steps taken
         hasToRecharge: Boolean indicating if the Roomba needs to recharge
         cleaned_trash: Amount of trash cleaned
@@ -42,14 +43,20 @@ class Roomba(CellAgent):
         self.stationCell = self.cell # Store the initial station cell
         self.state = "idle"
         self.battery = 100
-        self.visited_cells = set([self.cell.coordinate]) # Store visited cells
+        self.visited = np.zeros((model.width, model.height), dtype=bool) # Store visited cells
+        self.visited[self.cell.coordinate] = True
         self.trash_known_cells = set() # Seen trash cells (not yet cleaned)
-        self.pathToStation = []
+        self.pathToUnvisited = []
         self.distance_to_station = 0
         self.steps = 0
         self.hasToRecharge = False
         self.cleaned_trash = 0
         self.recharges = 0
+
+        # A* buffers shared by every search of this roomba (see a_star)
+        # They are allocated by the first search, since some roombas never run one
+        self._search_gen = 0
+        self._c_list = None
     
     def checkBattery(self):
         """Check battery level and decide next action."""
@@ -72,9 +79,11 @@ class Roomba(CellAgent):
         """Check for trash in the current cell"""
 
         # Get trash agent in the current cell
-        trash_cell = next(
-            (obj for obj in self.cell.agents if isinstance(obj, TrashAgent)), None
-        )
+        trash_cell = None
+        if self.model.trash_mask[self.cell.coordinate]:
+            trash_cell = next(
+                (obj for obj in self.cell.agents if isinstance(obj, TrashAgent)), None
+            )
 
         # If returning, store trash cell for later cleaning
         if (self.state == "returning") and trash_cell:
@@ -92,54 +101,49 @@ class Roomba(CellAgent):
     def checkObstacles(self):
         """Choose next cell prioritizing non-visited and obstacle-free cells."""
 
-        # Select valid neighboring cells
-        valid_neighbors = self.cell.neighborhood.select(
-            lambda cell: not any(isinstance(obj, ObstacleAgent) for obj in cell.agents)
-        )
-
-        # Among valid neighbors, prefer those with trash
-        trash_cells = valid_neighbors.select(
-            lambda cell: any(isinstance(obj, TrashAgent) for obj in cell.agents)
-        )
-
-        # Get unvisited cells
-        unvisited_cells = valid_neighbors.select(
-            lambda cell: cell.coordinate not in self.visited_cells
-        )
+        # Classify the neighbors in a single pass, by coordinate
+        # Only the chosen one is looked up in the grid
+        grid = self.model.grid
+        obstacle_mask = self.model.obstacle_mask
+        trash_mask = self.model.trash_mask
+        visited = self.visited
+        valid_neighbors = [] # Obstacle-free neighbors
+        trash_cells = [] # Valid neighbors with trash
+        unvisited_cells = [] # Valid neighbors not visited yet
+        for coord in self.model.neighbor_coords[self.cell.coordinate]:
+            if obstacle_mask[coord]:
+                continue
+            valid_neighbors.append(coord)
+            if trash_mask[coord]:
+                trash_cells.append(coord)
+            if not visited[coord]:
+                unvisited_cells.append(coord)
 
         # Priority: trash, trash known, unvisited, any valid
         if trash_cells:
-            next_cell = trash_cells.select_random_cell()
+            next_coord = self.random.choice(trash_cells)
         elif self.trash_known_cells:
             path = self.pathToNearestTrash()
             if len(path) > 0:
                 next_coord = path[0]
-                next_cell = self.model.grid[next_coord]
             else:
                 # If no path found, choose any valid neighbor
-                next_cell = valid_neighbors.select_random_cell()
+                next_coord = self.random.choice(valid_neighbors)
         elif unvisited_cells:
-            next_cell = unvisited_cells.select_random_cell()
+            next_coord = self.random.choice(unvisited_cells)
         else:
             # Path to the nearest unvisited cell
-            path = self.pathToNearestUnvisited("unvisited")
+            # If all cells have been visited, path to the nearest trash
+            path = self.pathToNearestUnvisited("unvisited", "trash")
                 
             if len(path) > 0:
                 next_coord = path[0]
-                next_cell = self.model.grid[next_coord]
             else:
-                # If all cells have been visited, find nearest trash with A*
-                path = self.pathToNearestUnvisited("trash")
-
-                if len(path) > 0:
-                    next_coord = path[0]
-                    next_cell = self.model.grid[next_coord]
-                else:
-                    next_cell = valid_neighbors.select_random_cell()
+                next_coord = self.random.choice(valid_neighbors)
         
         # Move to the selected cell
         self.state = "moving"
-        return next_cell
+        return grid[next_coord]
 
     def move(self, cell):
         """Move the Roomba to the specified cell."""
@@ -147,7 +151,7 @@ class Roomba(CellAgent):
         self.cell = cell
         
         # Mark cell as visited
-        self.visited_cells.add(cell.coordinate)
+        self.visited[cell.coordinate] = True
         self.steps += 1
 
         # Mark ground as explored
@@ -158,7 +162,6 @@ class Roomba(CellAgent):
         # Check if reached station
         if self.cell == self.stationCell and self.hasToRecharge:
             self.state = "recharging"
-            self.pathToStation = []  # Clear path when arrived
         else:
             # If the station is not reached, go back to idle
             self.state = "idle"
@@ -166,8 +169,10 @@ class Roomba(CellAgent):
     def clean(self, trash_cell):
         """If possible, clean the trash in the current cell."""
         trash_cell.with_trash = False
+        self.model.trash_mask[self.cell.coordinate] = False
         trash_cell.remove()
         self.cleaned_trash += 1
+        self.model.remaining_trash -= 1
         self.state = "idle"
     
     def a_star(self, start, goal):
@@ -183,72 +188,114 @@ class Roomba(CellAgent):
         - Lorena Estefanía Chewtat Torres
         """
 
-        # Calculate Manhattan distance
-        # We have to estimate heuristic using this distance
-        # since it is not given from the model
-        # Ref: https://www.geeksforgeeks.org/dsa/a-search-algorithm/
-        def heuristic(a, b):
-            return abs(a[0] - b[0]) + abs(a[1] - b[1])
+        # Trivial cases: already at the goal, or the goal is a free neighbor
+        if start == goal:
+            return []
+        if goal in self.model.neighbor_coords[start] and not self.model.obstacle_mask[goal]:
+            return [goal]
 
         # Initialize variables
-        grid = self.model.grid
-        stack = [] # Stack of nodes to explore
-        c_list = {}  # g values
-        visited = set()  # visited nodes
-
-        # Father vector to reconstruct path
-        fathers = {}
-
-        # Initialize stack with start node
-        # Heap already sorts by smallest f value
-        heapq.heappush(stack, (0, start))
-        c_list[start] = 0
-
-        # While the stack is not empty
+        # Nodes are plain ints (x * height + y) until the path is rebuilt
+        goal_x, goal_y = goal
+        neighbor_indices = self.model.neighbor_indices
+        obstacle_mask = self.model.obstacle_mask.ravel()
+        height = self.model.height
+        start_index = start[0] * height + start[1]
+        goal_index = goal_x * height + goal_y
+
+        # Allocate the search buffers on the first search
+        if self._c_list is None:
+            num_cells = self.model.width * height
+            self._c_list = [0] * num_cells
+            self._c_gen = [0] * num_cells
+            self._h_list = [0] * num_cells
+            self._visited_gen = [0] * num_cells
+            self._fathers = [0] * num_cells
+            self._buckets = [deque()]
+
+        # Reuse the search buffers, indexed by node
+        # A slot only counts if its generation is the current search
+        self._search_gen += 1
+        search_gen = self._search_gen
+        c_list = self._c_list  # g values
+        c_gen = self._c_gen  # search that set each g value
+        h_list = self._h_list  # heuristic values, valid where c_gen is current
+        visited = self._visited_gen  # search that visited each node
+        fathers = self._fathers  # father vector to reconstruct path
+
+        # Nodes to explore, in buckets by f value (f values are small integers)
+        # Each bucket is first in, first out, and min_f points to the lowest bucket
+        # that may not be empty, so no comparisons between nodes are needed
+        # The buckets are kept between searches, emptying what the last one left
+        buckets = self._buckets
+        for bucket in buckets:
+            if bucket:
+                bucket.clear()
+        buckets[0].append(start_index)
+        min_f = 0
+        pending = 1
+
+        c_list[start_index] = 0
+        c_gen[start_index] = search_gen
+
+        # While there are nodes to explore
         # Explore neighbors with lowest f value
-        while len(stack) > 0:
-            
+        while pending > 0:
+
             # Get node with lowest f value
-            # This returns f, coordinate
-            # but we only need coordinate, so we use _
-            _, current = heapq.heappop(stack)
+            while not buckets[min_f]:
+                min_f += 1
+            current = buckets[min_f].popleft()
+            pending -= 1
 
             # If the node hasnt been visited, process it
-            if current not in visited:
+            if visited[current] != search_gen:
 
                 # Mark as visited
-                visited.add(current)
+                visited[current] = search_gen
 
                 # If we reached the goal, finish
-                if (current == goal):
+                if (current == goal_index):
                     break
 
                 # Explore neighbors
-                # Get valid neighbors (not obstacles)                
-                valid_neighbors = grid[current].neighborhood.select(
-                    lambda cell: not any(isinstance(a, ObstacleAgent) for a in cell.agents)
-                )
-                
-                # For each valid neighbor, calculate costs and update structures
-                for neighbor_cell in valid_neighbors:
-                    neighbor = neighbor_cell.coordinate
-                    actual_c = c_list[current] + 1 # Cost between nodes is 1
-
-                    # If the new cost is lower, calculate f and add to stack
-                    if (actual_c < c_list.get(neighbor, float('inf'))):
-                        c_list[neighbor] = actual_c
-                        fathers[neighbor] = current
-                        f_value = actual_c + heuristic(neighbor, goal)
-
-                        # Add to stack
-                        heapq.heappush(stack, (f_value, neighbor))
-
-        # Reconstruct path
-        if goal in fathers:
+                # For each valid neighbor (not obstacles), calculate costs and update structures
+                actual_c = c_list[current] + 1 # Cost between nodes is 1
+                for neighbor in neighbor_indices[current]:
+                    if obstacle_mask[neighbor]:
+                        continue
+
+                    # The first time the neighbor is reached, compute its heuristic
+                    # and keep it for later relaxations (the goal is fixed per search)
+                    # We have to estimate heuristic using Chebyshev distance
+                    # since it is not given from the model. With diagonal moves
+                    # it never overestimates, so the path found is a shortest one
+                    # Ref: https://www.geeksforgeeks.org/dsa/a-search-algorithm/
+                    if c_gen[neighbor] != search_gen:
+                        neighbor_x, neighbor_y = divmod(neighbor, height)
+                        h_list[neighbor] = max(abs(neighbor_x - goal_x), abs(neighbor_y - goal_y))
+                        c_gen[neighbor] = search_gen
+                    elif actual_c >= c_list[neighbor]:
+                        continue
+
+                    # The new cost is lower, calculate f and add to its bucket
+                    c_list[neighbor] = actual_c
+                    fathers[neighbor] = current
+                    f_value = actual_c + h_list[neighbor]
+
+                    # Add to bucket (f never drops along a step, so it is
+                    # never below min_f)
+                    while len(buckets) <= f_value:
+                        buckets.append(deque())
+                    buckets[f_value].append(neighbor)
+                    pending += 1
+
+        # Reconstruct path, back to (x, y) coordinates
+        if c_gen[goal_index] == search_gen:
             path = []
-            current = goal
-            while current != start:
-                path.append(current)
+            current = goal_index
+            while current != start_index:
+                path.append(divmod(current, height))
                 current = fathers[current]
             path.reverse()
             return path
@@ -259,13 +306,12 @@ class Roomba(CellAgent):
     def getNextReturnMove(self):
         """Select next cell to move towards the station."""
 
-        # If there is no calculated path, calculate it
-        if not self.pathToStation:
-            self.calculateReturn()
-        
+        # Get the next step, precomputed by the model
+        next_node = self.model.next_step_to_station[self.cell.coordinate]
+
         # Follow the path step by step
-        if self.pathToStation:
-            next_coord = self.pathToStation.pop(0) # Get first coordinate and remove it
+        if next_node >= 0:
+            next_coord = divmod(int(next_node), self.model.height)
             next_cell = self.model.grid[next_coord]
             self.state = "moving"
             return next_cell
@@ -274,13 +320,6 @@ class Roomba(CellAgent):
             self.state = "idle"
             return None
 
-    def calculateReturn(self):
-        """Calculate path and distance to station."""
-        start = self.cell.coordinate
-        goal = self.stationCell.coordinate
-        path = self.a_star(start, goal)
-        self.pathToStation = path
-    
     def recharge(self):
         """Recharge the Roomba's battery."""
         self.battery += 5
@@ -292,68 +331,101 @@ class Roomba(CellAgent):
             self.recharges += 1
             self.state = "idle"
     
-    def pathToNearestUnvisited(self, cellType):
+    def pathToNearestUnvisited(self, *cellTypes):
         """
         Find the nearest unvisited cell to the roomba
 
-        Similar to A*, but we stop when we find the first unvisited cell.
-        Then the path to that cell is calculated using A*.
+        A single Dijkstra search over the model graph gives the distance
+        and predecessor of every reachable cell, so the nearest target
+        and the path to it come out of the same search.
+        The cell types are tried in order on that same search, and the
+        first one with a reachable cell is used.
         """
-        grid = self.model.grid
-        start = self.cell.coordinate
-
-        visited = set(start)
-        # Instead of heap with A*, we use queue
-        # To get first item inserted
-        queue = deque([start])
-
-        # While there are cells to explore
-        while len(queue) > 0:
-            # Get the next cell to explore
-            current = queue.popleft()
-            cell = grid[current]
+        # Keep following the last path while the roomba is on it
+        # and its target is still valid, instead of searching again
+        path = self.pathToUnvisited
+        if len(path) > 1 and path[0] == self.cell.coordinate and (not self.visited[path[-1]] or self.model.trash_mask[path[-1]]):
+            self.pathToUnvisited = path[1:]
+            return self.pathToUnvisited
+
+        height = self.model.height
+        current_x, current_y = self.cell.coordinate
+        start = current_x * height + current_y
+
+        # Distances and predecessors from the current cell to all cells
+        distances, predecessors = dijkstra(
+            self.model.graph, indices=start, return_predecessors=True, unweighted=True
+        )
 
+        for cellType in cellTypes:
             if (cellType == "unvisited"):
-                # If the cell is unvisited and reachable, calculate path
-                if cell.coordinate not in self.visited_cells and not any(isinstance(a, ObstacleAgent) for a in cell.agents):
-                    return self.a_star(start, cell.coordinate)
+                # Reachable cells that havent been visited
+                targets = ~(self.model.obstacle_mask | self.visited)
             elif (cellType == "trash"):
-                # If the cell has trash, calculate path
-                if any(isinstance(a, TrashAgent) for a in cell.agents):
-                    return self.a_star(start, cell.coordinate)
+                # Reachable cells with trash
+                targets = self.model.trash_mask
 
-            # Otherwise, get neighbors and explore them
-            valid_neighbors = cell.neighborhood.select(
-                lambda cell: not any(isinstance(a, ObstacleAgent) for a in cell.agents)
-            )
+            # Pick the nearest target
+            target_distances = np.where(targets.ravel(), distances, np.inf)
+            target = int(target_distances.argmin())
 
-            # For each neighbor, add to queue if unvisited
-            for neighbor_cell in valid_neighbors:
-                neighbor = neighbor_cell.coordinate
-                if (neighbor) not in visited:
-                    queue.append(neighbor)
-                    visited.add(neighbor)
+            # If a target is reachable, return path to it
+            if target_distances[target] != np.inf:
+                self.pathToUnvisited = self.pathFromPredecessors(predecessors, start, target)
+                return self.pathToUnvisited
 
-        # If no unvisited cell found, return empty path
+        # If no target is reachable, return empty path
+        self.pathToUnvisited = []
         return []
+
+    def pathFromPredecessors(self, predecessors, start, goal):
+        """Reconstruct the path to a graph node from the Dijkstra predecessors."""
+        height = self.model.height
+        path = []
+        current = goal
+        while current != start:
+            path.append((current // height, current % height))
+            current = int(predecessors[current])
+        path.reverse()
+        return path
     
     def pathToNearestTrash(self):
         """From trash cellls listed, find the nearest one and return path to it."""
-        # Take the last trash cell added (closest one)
-        trash_cell = self.trash_known_cells.pop()
+        # Forget trash cells that have already been cleaned
+        trash_mask = self.model.trash_mask
+        self.trash_known_cells = {coord for coord in self.trash_known_cells if trash_mask[coord]}
+
+        # If there is no trash left, return empty path
+        if not self.trash_known_cells:
+            return []
+
+        # Take the nearest trash cell (Chebyshev distance, the number of
+        # moves on an open grid with diagonal moves)
+        current_x, current_y = self.cell.coordinate
+        trash_cell = min(
+            self.trash_known_cells,
+            key=lambda coord: max(abs(coord[0] - current_x), abs(coord[1] - current_y))
+        )
+
+        # Keep the trash cell known until it is cleaned, so the next steps
+        # keep heading to it; forget it only if it cannot be reached
+        path = self.a_star(self.cell.coordinate, trash_cell)
+        if not path:
+            self.trash_known_cells.remove(trash_cell)
 
         # Return path to that trash cell
-        return self.a_star(self.cell.coordinate, trash_cell)
+        return path
 
     def distanceToStation(self):
-        """Calculate Chebyshev distance to the station."""
-        base_x, base_y = self.stationCell.coordinate # Station coordinates
-        current_x, current_y = self.cell.coordinate # Current coordinates
-
-        # Calculate Chebyshev distance
-        self.distance_to_station = max(abs(current_x - base_x), abs(current_y - base_y))
+        """Get the path distance to the station, precomputed by the model."""
+        self.distance_to_station = float(self.model.dist_to_station[self.cell.coordinate])
         return self.distance_to_station
 
+    def remove(self):
+        """Remove the Roomba from the model."""
+        super().remove()
+        self.model.roomba = None
+
     def step(self):
         """
         Execute one step of the Roomba's behavior based on the state machine.
@@ -395,16 +467,6 @@ class TrashAgent(FixedAgent):
     Attributes:
         with_trash: Boolean indicating if the trash is present
     """
-    @property
-    def with_trash(self):
-        """Whether the cell has trash."""
-        return self._with_trash
-    
-    @with_trash.setter
-    def with_trash(self, value: bool) -> None:
-        """Set trash presence state."""
-        self._with_trash = value
-
     def __init__(self, model, cell):
         """Create a new trash object
 
@@ -414,7 +476,8 @@ class TrashAgent(FixedAgent):
         """
         super().__init__(model)
         self.cell=cell
-        self._with_trash = True
+        self.with_trash = True
+        model.trash_mask[cell.coordinate] = True
 
 class Station(FixedAgent):
     """
@@ -434,6 +497,7 @@ class ObstacleAgent(FixedAgent):
     def __init__(self, model, cell):
         super().__init__(model)
         self.cell=cell
+        model.obstacle_mask[cell.coordinate] = True
 
     def step(self):
         pass
@@ -445,16 +509,6 @@ class Ground(FixedAgent):
     Attributes:
         explored: Boolean indicating if the cell has been explored
     """
-    @property
-    def explored(self):
-        """Whether the cell has been explored."""
-        return self._explored
-
-    @explored.setter
-    def explored(self, value: bool) -> None:
-        """Set explored state."""
-        self._explored = value
-
     def __init__(self, model, cell):
         """Create a new ground object
 
@@ -464,4 +518,4 @@ class Ground(FixedAgent):
         """
         super().__init__(model)
         self.cell=cell
-        self._explored = False
\ No newline at end of file
+        self.explored = False
\ No newline at end of file
@@ -5,12 +5,18 @@ Diego Córdova Rodríguez, A01781166
 2025-11-24
 """
 
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
 from mesa import Model
 from mesa.discrete_space import OrthogonalMooreGrid
 from mesa.datacollection import DataCollector
 
 from .agent import Roomba, ObstacleAgent, TrashAgent, Station, Ground
 
+# (dx, dy) offsets of the 8 Moore neighbors, in the grid's neighborhood order
+MOORE_OFFSETS = tuple((dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if (dx, dy) != (0, 0))
+
 class RandomModel(Model):
     """
     Creates a new model with random agents.
@@ -34,44 +40,103 @@ class RandomModel(Model):
         # Initialize grid
         self.grid = OrthogonalMooreGrid([width, height], torus=False)
 
+        # Neighbor coordinates of every cell, the grid never changes
+        self.neighbor_coords = {
+            (x, y): tuple(
+                (x + dx, y + dy) for dx, dy in MOORE_OFFSETS
+                if 0 <= x + dx < width and 0 <= y + dy < height
+            )
+            for x in range(width) for y in range(height)
+        }
+
+        # Same neighbors by node index (x * height + y), for the A* search
+        self.neighbor_indices = [
+            tuple(nx * height + ny for nx, ny in self.neighbor_coords[x, y])
+            for x in range(width) for y in range(height)
+        ]
+
+        # Cells with obstacles and trash, indexed by [x, y]
+        # Updated when obstacles and trash are placed or cleaned
+        self.obstacle_mask = np.zeros((width, height), dtype=bool)
+        self.trash_mask = np.zeros((width, height), dtype=bool)
+
+        # The only roomba in the simulation, None once it runs out of battery
+        self.roomba = None
+
         # Setup data collection
         model_reporters = {
             "Time (Steps)": lambda m: m.steps,
-            "Trash Collected %": lambda m: (m.num_trash - len(m.agents_by_type[TrashAgent])) / m.num_trash * 100 if m.num_trash > 0 else 100,
-            "Battery %": lambda m: next((agent.battery for agent in m.agents_by_type[Roomba]), 0),
-            "Movements": lambda m: next((agent.steps for agent in m.agents_by_type[Roomba]), 0),
-            "Recharges": lambda m: next((agent.recharges for agent in m.agents_by_type[Roomba]), 0),
+            "Trash Collected %": lambda m: (m.num_trash - m.remaining_trash) / m.num_trash * 100 if m.num_trash > 0 else 100,
+            "Battery %": lambda m: m.roomba.battery if m.roomba else 0,
+            "Movements": lambda m: m.roomba.steps if m.roomba else 0,
+            "Recharges": lambda m: m.roomba.recharges if m.roomba else 0,
         }
         self.datacollector = DataCollector(model_reporters)
 
-        # Identify the coordinates of the border of the grid
-        border = [(x,y)
-                  for y in range(height)
-                  for x in range(width)
-                  if y in [0, height-1] or x in [0, width - 1]]
+        # Coordinates of the border of the grid, column by column:
+        # the whole first and last columns, and the ends of the others
+        border = (
+            (x, y)
+            for x in range(width)
+            for y in (range(height) if x in (0, width - 1) else (0, height - 1))
+        )
 
         # Create the border cells
-        for _, cell in enumerate(self.grid):
-            if cell.coordinate == (1,1):
-                # Place roomba and station at (1,1)
-                Roomba(self, cell=cell)
-                Station(self, cell=cell)
-            if cell.coordinate in border:
-                ObstacleAgent(self, cell=cell)
+        for coord in border:
+            ObstacleAgent(self, cell=self.grid[coord])
+
+        # Place roomba and station at (1,1)
+        station_cell = self.grid[(1, 1)]
+        self.roomba = Roomba(self, cell=station_cell)
+        Station(self, cell=station_cell)
+
+        # Pick random positions for obstacles and trash at once
+        # Sampling without replacement keeps them in different cells
+        empty_cells = self.grid.empties.cells
+        self.num_obstacles = min(self.num_obstacles, len(empty_cells))
+        self.num_trash = min(self.num_trash, len(empty_cells) - self.num_obstacles)
+        self.remaining_trash = self.num_trash # Decreased by roombas when cleaning
+        positions = self.rng.choice(
+            len(empty_cells), size=self.num_obstacles + self.num_trash, replace=False
+        )
 
         # Add obstacles at random positions
         ObstacleAgent.create_agents(
             self,
             self.num_obstacles,
-            cell=self.random.choices(self.grid.empties.cells, k=self.num_obstacles)
+            cell=[empty_cells[i] for i in positions[:self.num_obstacles]]
         )
 
         # Add trash at random positions
         TrashAgent.create_agents(
             self,
             self.num_trash,
-            cell=self.random.choices(self.grid.empties.cells, k=self.num_trash)
+            cell=[empty_cells[i] for i in positions[self.num_obstacles:]]
+        )
+
+        # Graph of obstacle-free cells for shortest path searches
+        # Cell (x, y) is node x * height + y, joined to its free neighbors
+        # Obstacles never move, so it is built only once
+        edges = [
+            (x * height + y, nx * height + ny)
+            for (x, y), neighbors in self.neighbor_coords.items() if not self.obstacle_mask[x, y]
+            for nx, ny in neighbors if not self.obstacle_mask[nx, ny]
+        ]
+        rows, cols = zip(*edges) if edges else ((), ())
+        self.graph = csr_matrix(
+            (np.ones(len(edges)), (rows, cols)), shape=(width * height, width * height)
+        )
+
+        # Distance from every cell to the station and the next step towards it
+        # The graph is undirected, so in a search rooted at the station
+        # the predecessor of a cell is its next step back to the station
+        station_x, station_y = station_cell.coordinate
+        distances, predecessors = dijkstra(
+            self.graph, indices=station_x * height + station_y,
+            return_predecessors=True, unweighted=True
         )
+        self.dist_to_station = distances.reshape(width, height)
+        self.next_step_to_station = predecessors.reshape(width, height)
 
         # Create ground for all cells
         for _, cell in enumerate(self.grid):
@@ -95,19 +160,18 @@ class RandomModel(Model):
         self.datacollector.collect(self)
 
         # Stop the model if all trash is collected
-        if len(self.agents_by_type[TrashAgent]) == 0 or self.steps >= int(self.max_steps):
+        if self.remaining_trash == 0 or self.steps >= int(self.max_steps):
             self.running = False
 
             # Only print the last step
-            # df gets the data collected from the model
-            df = self.datacollector.get_model_vars_dataframe()
-            last_row = df.tail(1).iloc[0]
+            # Read the last value of every reporter (no DataFrame needed)
+            last_row = {col: values[-1] for col, values in self.datacollector.model_vars.items()}
 
             print() # Add an empty line before the output
             print("------ Simulation Results ------")
             # Print the last row of data collected
-            for col in df.columns:
-                print(f"{col}: {last_row[col]}")
+            for col, value in last_row.items():
+                print(f"{col}: {value}")
 
             print("-------------------------------")
 
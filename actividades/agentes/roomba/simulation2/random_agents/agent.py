@@ -6,8 +6,9 @@ Diego Córdova Rodríguez, A01781166
 """
 
 from mesa.discrete_space import CellAgent, FixedAgent
-from collections import deque # Utilized for finding nearest unvisited cell
-import heapq # Utilized for A* algorithm
+from scipy.sparse.csgraph import dijkstra # Utilized for finding nearest unvisited cell
+import numpy as np
+from collections import deque # Utilized for A* algorithm
 
 class Roomba(CellAgent):
     """
@@ -21,8 +22,9 @@ class Roomba(CellAgent):
         stationCells: Set of coordinates of known stations
         state: Current state of the Roomba
         battery: Current battery level
-        visited_cells: Set of coordinates of visited cells
+        visited: Boolean mask of visited cells, indexed by [x, y]
         trash_known_cells: Set of coordinates of known trash cells
+        pathToUnvisited: Last path returned by pathToNearestUnvisited
         pathToStation: List of coordinates forming the path to the station
         distance_to_station: Chebyshev distance to the station
         hasExchangedInfo: Boolean indicating if info has been exchanged recently
@@ -41,11 +43,15 @@ class Roomba(CellAgent):
         """
         super().__init__(model)
         self.cell = cell
+        model.roomba_positions.setdefault(cell.coordinate, []).append(self)
         self.stationCells = set([self.cell.coordinate]) # Known stations
+        self._stations_arr = None # Known stations as an (N, 2) array, built when needed
         self.state = "idle"
         self.battery = 100
-        self.visited_cells = set([self.cell.coordinate]) # Visited cells
+        self.visited = np.zeros((model.width, model.height), dtype=bool) # Visited cells
+        self.visited[self.cell.coordinate] = True
         self.trash_known_cells = set() # Seen trash cells (not yet cleaned)
+        self.pathToUnvisited = []
         self.pathToStation = []
         self.distance_to_station = 0
         self.hasExchangedInfo = False
@@ -54,6 +60,11 @@ class Roomba(CellAgent):
         self.hasToRecharge = False
         self.cleaned_trash = 0
         self.recharges = 0
+
+        # A* buffers shared by every search of this roomba (see a_star)
+        # They are allocated by the first search, since some roombas never run one
+        self._search_gen = 0
+        self._c_list = None
     
     def checkBattery(self):
         """Check battery level and decide next action."""
@@ -76,10 +87,12 @@ class Roomba(CellAgent):
         """Check if the station is still occupied."""
 
         # Look for stations in the neighborhood
-        station_cell = next(
-            (cell for cell in self.cell.neighborhood
-            if any(isinstance(obj, Station) for obj in cell.agents)), None
+        station_mask = self.model.station_mask
+        station_coord = next(
+            (coord for coord in self.model.neighbor_coords[self.cell.coordinate]
+            if station_mask[coord]), None
         )
+        station_cell = self.model.grid[station_coord] if station_coord else None
 
         # If found a station, check if occupied
         if station_cell:
@@ -97,9 +110,11 @@ class Roomba(CellAgent):
         """Check for trash in the current cell"""
 
         # Get trash agent in the current cell
-        trash_cell = next(
-            (obj for obj in self.cell.agents if isinstance(obj, TrashAgent)), None
-        )
+        trash_cell = None
+        if self.model.trash_mask[self.cell.coordinate]:
+            trash_cell = next(
+                (obj for obj in self.cell.agents if isinstance(obj, TrashAgent)), None
+            )
 
         # If returning, store trash cell for later cleaning
         if (self.state == "returning") and trash_cell:
@@ -117,69 +132,62 @@ class Roomba(CellAgent):
     def checkObstacles(self):
         """Choose next cell prioritizing non-visited and obstacle-free cells."""
 
-        # Select valid neighboring cells
-        valid_neighbors = self.cell.neighborhood.select(
-            lambda cell: not any(isinstance(obj, ObstacleAgent) for obj in cell.agents)
-        )
-
-        # Among valid neighbors, prefer those with trash
-        trash_cells = valid_neighbors.select(
-            lambda cell: any(isinstance(obj, TrashAgent) for obj in cell.agents)
-        )
-
-        # Get unvisited cells
-        unvisited_cells = valid_neighbors.select(
-            lambda cell: cell.coordinate not in self.visited_cells
-        )
-
-        # Look for stations in neighbors and add to known stations
-        station_cells = valid_neighbors.select(
-            lambda cell: any(isinstance(obj, Station) for obj in cell.agents)
-        )
-
-        for station_cell in station_cells:
-            self.addStation(station_cell)
+        # Classify the neighbors in a single pass, by coordinate
+        # Only the chosen one is looked up in the grid
+        grid = self.model.grid
+        obstacle_mask = self.model.obstacle_mask
+        trash_mask = self.model.trash_mask
+        visited = self.visited
+        station_mask = self.model.station_mask
+        valid_neighbors = [] # Obstacle-free neighbors
+        trash_cells = [] # Valid neighbors with trash
+        unvisited_cells = [] # Valid neighbors not visited yet
+        for coord in self.model.neighbor_coords[self.cell.coordinate]:
+            if obstacle_mask[coord]:
+                continue
+            valid_neighbors.append(coord)
+            if trash_mask[coord]:
+                trash_cells.append(coord)
+            if not visited[coord]:
+                unvisited_cells.append(coord)
+
+            # Add stations in neighbors to known stations
+            if station_mask[coord]:
+                self.addStation(grid[coord])
 
         # Priority: trash, trash known, unvisited, any valid
         if trash_cells:
-            next_cell = trash_cells.select_random_cell()
+            next_coord = self.random.choice(trash_cells)
         elif self.trash_known_cells:
             path = self.pathToNearestTrash()
             if len(path) > 0:
                 next_coord = path[0]
-                next_cell = self.model.grid[next_coord]
             else:
                 # If no path found, choose any valid neighbor
-                next_cell = valid_neighbors.select_random_cell()
+                next_coord = self.random.choice(valid_neighbors)
         elif unvisited_cells:
-            next_cell = unvisited_cells.select_random_cell()
+            next_coord = self.random.choice(unvisited_cells)
         else:
             # Path to the nearest unvisited cell
             path = self.pathToNearestUnvisited()
                 
             if len(path) > 0:
                 next_coord = path[0]
-                next_cell = self.model.grid[next_coord]
             else:
                 # If all cells have been visited, choose any valid neighbor
-                next_cell = valid_neighbors.select_random_cell()
+                next_coord = self.random.choice(valid_neighbors)
         
         # Move to the selected cell
         self.state = "moving"
-        return next_cell
+        return grid[next_coord]
 
     def checkRoomba(self, roomba_cell):
         """Check for roombas in neighboring cells to exchange information."""
-        # Get cells with other roombas
-        roomba_cells = roomba_cell.neighborhood.select(
-            lambda cell: any(isinstance(obj, Roomba) 
-            and obj != self for obj in cell.agents)
-        )
-
-        # Get the first roomba agent found in those cells
+        # Get the first other roomba found in the neighboring cells
+        roomba_positions = self.model.roomba_positions
         roomba_agent = next(
-            (obj for cell in roomba_cells for obj in cell.agents
-            if isinstance(obj, Roomba) and obj != self), None
+            (obj for coord in self.model.neighbor_coords[roomba_cell.coordinate]
+            for obj in roomba_positions.get(coord, ()) if obj != self), None
         )
 
         # If found a roomba and havent exchanged info recently, prepare to communicate
@@ -194,15 +202,19 @@ class Roomba(CellAgent):
         """Move the Roomba to the specified cell."""
 
         # If the cell is a station and its occupied, wait
+        # The roomba stays off its return path, so plan it again later
         if cell.coordinate in self.stationCells and self.hasToRecharge and self.stationOccupied(cell):
             self.state = "waiting"
+            self.pathToStation = []
             return
 
         # Move to the new cell
+        self.leavePosition()
+        self.model.roomba_positions.setdefault(cell.coordinate, []).append(self)
         self.cell = cell
 
         # Mark cell as visited
-        self.visited_cells.add(cell.coordinate)
+        self.visited[cell.coordinate] = True
         self.steps += 1
 
         # Mark ground as explored
@@ -215,6 +227,7 @@ class Roomba(CellAgent):
             occupied = self.stationOccupied(self.cell)
             if not occupied:
                 self.state = "recharging"
+                self.model.recharging_at[self.cell.coordinate] = self
                 self.pathToStation = []  # Clear path when arrived
             else:
                 # If occupied, wait
@@ -226,8 +239,10 @@ class Roomba(CellAgent):
     def clean(self, trash_cell):
         """If possible, clean the trash in the current cell."""
         trash_cell.with_trash = False
+        self.model.trash_mask[self.cell.coordinate] = False
         trash_cell.remove()
         self.cleaned_trash += 1
+        self.model.remaining_trash -= 1
         self.state = "idle"
     
     def a_star(self, start, goal):
@@ -243,72 +258,114 @@ class Roomba(CellAgent):
         - Lorena Estefanía Chewtat Torres
         """
 
-        # Calculate Manhattan distance
-        # We have to estimate heuristic using this distance
-        # since it is not given from the model
-        # Ref: https://www.geeksforgeeks.org/dsa/a-search-algorithm/
-        def heuristic(a, b):
-            return abs(a[0] - b[0]) + abs(a[1] - b[1])
+        # Trivial cases: already at the goal, or the goal is a free neighbor
+        if start == goal:
+            return []
+        if goal in self.model.neighbor_coords[start] and not self.model.obstacle_mask[goal]:
+            return [goal]
 
         # Initialize variables
-        grid = self.model.grid
-        stack = [] # Stack of nodes to explore
-        c_list = {}  # g values
-        visited = set()  # visited nodes
-
-        # Father vector to reconstruct path
-        fathers = {}
-
-        # Initialize stack with start node
-        # Heap already sorts by smallest f value
-        heapq.heappush(stack, (0, start))
-        c_list[start] = 0
-
-        # While the stack is not empty
+        # Nodes are plain ints (x * height + y) until the path is rebuilt
+        goal_x, goal_y = goal
+        neighbor_indices = self.model.neighbor_indices
+        obstacle_mask = self.model.obstacle_mask.ravel()
+        height = self.model.height
+        start_index = start[0] * height + start[1]
+        goal_index = goal_x * height + goal_y
+
+        # Allocate the search buffers on the first search
+        if self._c_list is None:
+            num_cells = self.model.width * height
+            self._c_list = [0] * num_cells
+            self._c_gen = [0] * num_cells
+            self._h_list = [0] * num_cells
+            self._visited_gen = [0] * num_cells
+            self._fathers = [0] * num_cells
+            self._buckets = [deque()]
+
+        # Reuse the search buffers, indexed by node
+        # A slot only counts if its generation is the current search
+        self._search_gen += 1
+        search_gen = self._search_gen
+        c_list = self._c_list  # g values
+        c_gen = self._c_gen  # search that set each g value
+        h_list = self._h_list  # heuristic values, valid where c_gen is current
+        visited = self._visited_gen  # search that visited each node
+        fathers = self._fathers  # father vector to reconstruct path
+
+        # Nodes to explore, in buckets by f value (f values are small integers)
+        # Each bucket is first in, first out, and min_f points to the lowest bucket
+        # that may not be empty, so no comparisons between nodes are needed
+        # The buckets are kept between searches, emptying what the last one left
+        buckets = self._buckets
+        for bucket in buckets:
+            if bucket:
+                bucket.clear()
+        buckets[0].append(start_index)
+        min_f = 0
+        pending = 1
+
+        c_list[start_index] = 0
+        c_gen[start_index] = search_gen
+
+        # While there are nodes to explore
         # Explore neighbors with lowest f value
-        while len(stack) > 0:
-            
+        while pending > 0:
+
             # Get node with lowest f value
-            # This returns f, coordinate
-            # but we only need coordinate, so we use _
-            _, current = heapq.heappop(stack)
+            while not buckets[min_f]:
+                min_f += 1
+            current = buckets[min_f].popleft()
+            pending -= 1
 
             # If the node hasnt been visited, process it
-            if current not in visited:
+            if visited[current] != search_gen:
 
                 # Mark as visited
-                visited.add(current)
+                visited[current] = search_gen
 
                 # If we reached the goal, finish
-                if (current == goal):
+                if (current == goal_index):
                     break
 
                 # Explore neighbors
-                # Get valid neighbors (not obstacles)                
-                valid_neighbors = grid[current].neighborhood.select(
-                    lambda cell: not any(isinstance(a, ObstacleAgent) for a in cell.agents)
-                )
-                
-                # For each valid neighbor, calculate costs and update structures
-                for neighbor_cell in valid_neighbors:
-                    neighbor = neighbor_cell.coordinate
-                    actual_c = c_list[current] + 1 # Cost between nodes is 1
-
-                    # If the new cost is lower, calculate f and add to stack
-                    if (actual_c < c_list.get(neighbor, float('inf'))):
-                        c_list[neighbor] = actual_c
-                        fathers[neighbor] = current
-                        f_value = actual_c + heuristic(neighbor, goal)
-
-                        # Add to stack
-                        heapq.heappush(stack, (f_value, neighbor))
-
-        # Reconstruct path
-        if goal in fathers:
+                # For each valid neighbor (not obstacles), calculate costs and update structures
+                actual_c = c_list[current] + 1 # Cost between nodes is 1
+                for neighbor in neighbor_indices[current]:
+                    if obstacle_mask[neighbor]:
+                        continue
+
+                    # The first time the neighbor is reached, compute its heuristic
+                    # and keep it for later relaxations (the goal is fixed per search)
+                    # We have to estimate heuristic using Chebyshev distance
+                    # since it is not given from the model. With diagonal moves
+                    # it never overestimates, so the path found is a shortest one
+                    # Ref: https://www.geeksforgeeks.org/dsa/a-search-algorithm/
+                    if c_gen[neighbor] != search_gen:
+                        neighbor_x, neighbor_y = divmod(neighbor, height)
+                        h_list[neighbor] = max(abs(neighbor_x - goal_x), abs(neighbor_y - goal_y))
+                        c_gen[neighbor] = search_gen
+                    elif actual_c >= c_list[neighbor]:
+                        continue
+
+                    # The new cost is lower, calculate f and add to its bucket
+                    c_list[neighbor] = actual_c
+                    fathers[neighbor] = current
+                    f_value = actual_c + h_list[neighbor]
+
+                    # Add to bucket (f never drops along a step, so it is
+                    # never below min_f)
+                    while len(buckets) <= f_value:
+                        buckets.append(deque())
+                    buckets[f_value].append(neighbor)
+                    pending += 1
+
+        # Reconstruct path, back to (x, y) coordinates
+        if c_gen[goal_index] == search_gen:
             path = []
-            current = goal
-            while current != start:
-                path.append(current)
+            current = goal_index
+            while current != start_index:
+                path.append(divmod(current, height))
                 current = fathers[current]
             path.reverse()
             return path
@@ -341,34 +398,51 @@ class Roomba(CellAgent):
     def calculateReturn(self):
         """
         Calculate distance to all free known stations and calculate path to the nearest one.
+
+        A single Dijkstra search from the current cell gives the path
+        distance to every station and the path to the nearest one.
         """
         # Get current position
-        start = self.cell.coordinate
+        height = self.model.height
+        current_x, current_y = self.cell.coordinate
+        start = current_x * height + current_y
+
+        # Pick the nearest available station by path distance, in one pass
+        # The search only runs once a station that is not occupied is found
+        recharging_at = self.model.recharging_at
+        distances = predecessors = None
+        goal = None
+        for coord in self.stationCells:
+            if recharging_at.get(coord, self) is not self:
+                continue
+
+            # Distances and predecessors from the current cell to all cells
+            if distances is None:
+                distances, predecessors = dijkstra(
+                    self.model.graph, indices=start, return_predecessors=True, unweighted=True
+                )
 
-        # Calculate Chebyshev distances to all available stations
-        available_stations = [
-            coord for coord in self.stationCells
-            if not self.stationOccupied(self.model.grid[coord])
-        ]
+            # Ties go to the lowest coordinate, so the choice does not
+            # depend on the order of the stationCells set
+            node = coord[0] * height + coord[1]
+            if goal is None or (distances[node], node) < (distances[goal], goal):
+                goal = node
 
         # If all stations are occupied, do nothing
-        if not available_stations:
+        if goal is None:
             self.state = "waiting"
             self.pathToStation = []
             return
 
-        # Pick the nearest station
-        nearest_station = self.distanceToStation(available_stations)
-
-        # If no station found, wait
-        if nearest_station is None:
+        # If no station can be reached, wait
+        if distances[goal] == np.inf:
             self.state = "waiting"
             self.pathToStation = []
             return
 
-        # Calculate path to nearest station using A*
-        path = self.a_star(start, nearest_station)
-        
+        # Calculate path to nearest station
+        path = self.pathFromPredecessors(predecessors, start, goal)
+
         # If a path is found, set it
         if path:
             self.pathToStation = path
@@ -387,54 +461,84 @@ class Roomba(CellAgent):
             self.hasToRecharge = False
             self.recharges += 1
             self.state = "idle"
+            del self.model.recharging_at[self.cell.coordinate]
     
     def pathToNearestUnvisited(self):
         """
         Find the nearest unvisited cell to the roomba
 
-        Similar to A*, but we stop when we find the first unvisited cell.
-        Then the path to that cell is calculated using A*.
+        A single Dijkstra search over the model graph gives the distance
+        and predecessor of every reachable cell, so the nearest unvisited
+        cell and the path to it come out of the same search.
         """
-        grid = self.model.grid
-        start = self.cell.coordinate
-
-        visited = set(start)
-        # Instead of heap with A*, we use queue
-        # To get first item inserted
-        queue = deque([start])
-
-        # While there are cells to explore
-        while len(queue) > 0:
-            # Get the next cell to explore
-            current = queue.popleft()
-            cell = grid[current]
-
-            # If the cell is unvisited and reachable, calculate path
-            if cell.coordinate not in self.visited_cells and not any(isinstance(a, ObstacleAgent) for a in cell.agents):
-                return self.a_star(start, cell.coordinate)
-
-            # Otherwise, get neeighbors and explore them
-            valid_neighbors = cell.neighborhood.select(
-                lambda cell: not any(isinstance(a, ObstacleAgent) for a in cell.agents)
-            )
+        # Keep following the last path while the roomba is on it
+        # and its target is still valid, instead of searching again
+        path = self.pathToUnvisited
+        if len(path) > 1 and path[0] == self.cell.coordinate and not self.visited[path[-1]]:
+            self.pathToUnvisited = path[1:]
+            return self.pathToUnvisited
+
+        height = self.model.height
+        current_x, current_y = self.cell.coordinate
+        start = current_x * height + current_y
 
-            # For each neighbor, add to queue if unvisited
-            for neighbor_cell in valid_neighbors:
-                neighbor = neighbor_cell.coordinate
-                if (neighbor) not in visited:
-                    queue.append(neighbor)
-                    visited.add(neighbor)
+        # Distances and predecessors from the current cell to all cells
+        distances, predecessors = dijkstra(
+            self.model.graph, indices=start, return_predecessors=True, unweighted=True
+        )
 
-        # If no unvisited cell found, return empty path
-        return []
+        # Reachable cells that havent been visited
+        targets = ~(self.model.obstacle_mask | self.visited)
+
+        # Pick the nearest unvisited cell
+        distances = np.where(targets.ravel(), distances, np.inf)
+        target = int(distances.argmin())
+
+        # If no unvisited cell is reachable, return empty path
+        if distances[target] == np.inf:
+            self.pathToUnvisited = []
+            return []
+
+        self.pathToUnvisited = self.pathFromPredecessors(predecessors, start, target)
+        return self.pathToUnvisited
+
+    def pathFromPredecessors(self, predecessors, start, goal):
+        """Reconstruct the path to a graph node from the Dijkstra predecessors."""
+        height = self.model.height
+        path = []
+        current = goal
+        while current != start:
+            path.append((current // height, current % height))
+            current = int(predecessors[current])
+        path.reverse()
+        return path
 
     def pathToNearestTrash(self):
         """From trash cellls listed, find the nearest one and return path to it."""
-        # Take the last trash cell added (closest one)
-        trash_cell = self.trash_known_cells.pop()
+        # Forget trash cells that have already been cleaned
+        trash_mask = self.model.trash_mask
+        self.trash_known_cells = {coord for coord in self.trash_known_cells if trash_mask[coord]}
+
+        # If there is no trash left, return empty path
+        if not self.trash_known_cells:
+            return []
+
+        # Take the nearest trash cell (Chebyshev distance, the number of
+        # moves on an open grid with diagonal moves)
+        current_x, current_y = self.cell.coordinate
+        trash_cell = min(
+            self.trash_known_cells,
+            key=lambda coord: max(abs(coord[0] - current_x), abs(coord[1] - current_y))
+        )
+
+        # Keep the trash cell known until it is cleaned, so the next steps
+        # keep heading to it; forget it only if it cannot be reached
+        path = self.a_star(self.cell.coordinate, trash_cell)
+        if not path:
+            self.trash_known_cells.remove(trash_cell)
 
         # Return path to that trash cell
-        return self.a_star(self.cell.coordinate, trash_cell)
+        return path
 
     def distanceToStation(self, stations=None):
         """Using ChebyShev, calculate smallest distance to known stations and return the nearest station cell."""
@@ -448,10 +552,21 @@ class Roomba(CellAgent):
             self.distance_to_station = float('inf')
             return None
 
+        current_x, current_y = self.cell.coordinate
+
+        # With many known stations, compute all the distances at once with NumPy
+        if stations is self.stationCells and len(stations) > 4:
+            if self._stations_arr is None:
+                self._stations_arr = np.array(list(stations), dtype=np.int32)
+            coords = self._stations_arr
+            distances = np.abs(coords - (current_x, current_y)).max(axis=1)
+            nearest = int(distances.argmin())
+            self.distance_to_station = int(distances[nearest])
+            return tuple(coords[nearest].tolist())
+
         # Variables to track nearest station
         min_distance = float('inf')
         nearest_station = None
-        current_x, current_y = self.cell.coordinate
 
         # Find the nearest known station
         for coord in stations:
@@ -471,14 +586,14 @@ class Roomba(CellAgent):
         """Update the set of visited cells and known stations with the ones the other roomba has."""
 
         # Update visited cells
-        for cell in other_roomba.visited_cells:
-            if cell not in self.visited_cells:
-                self.visited_cells.add(cell)
+        self.visited |= other_roomba.visited
         
         # Update known stations
-        for station_coord in other_roomba.stationCells:
-            if station_coord not in self.stationCells:
-                self.stationCells.add(station_coord)
+        new_stations = other_roomba.stationCells - self.stationCells
+        if new_stations:
+            self.stationCells |= new_stations
+            self._stations_arr = None
+            self.pathToStation = []  # A new station may be closer
         
         # Set timer to avoid multiple exchanges in short time
         self.hasExchangedInfo = True
@@ -491,17 +606,26 @@ class Roomba(CellAgent):
         # If not already known, add it
         if station_cell.coordinate not in self.stationCells:
             self.stationCells.add(station_cell.coordinate)
+            self._stations_arr = None
+            self.pathToStation = []  # A new station may be closer
     
     def stationOccupied(self, station_cell):
         """Check if a station cell is occupied by another recharging roomba."""
 
-        # If any roomba in the cell is recharging, the station is occupied
-        occupied = any(
-            isinstance(agent, Roomba) and agent is not self and agent.state == "recharging"
-            for agent in station_cell.agents
-        )
+        # If another roomba is recharging in the cell, the station is occupied
+        return self.model.recharging_at.get(station_cell.coordinate, self) is not self
+
+    def leavePosition(self):
+        """Remove the Roomba from the roombas listed on its current cell."""
+        roombas = self.model.roomba_positions[self.cell.coordinate]
+        roombas.remove(self)
+        if not roombas:
+            del self.model.roomba_positions[self.cell.coordinate]
 
-        return occupied
+    def remove(self):
+        """Remove the Roomba from the model."""
+        self.leavePosition()
+        super().remove()
 
     def step(self):
         """
@@ -559,16 +683,6 @@ class TrashAgent(FixedAgent):
     Attributes:
         with_trash: Boolean indicating if the trash is present
     """
-    @property
-    def with_trash(self):
-        """Whether the cell has trash."""
-        return self._with_trash
-    
-    @with_trash.setter
-    def with_trash(self, value: bool) -> None:
-        """Set trash presence state."""
-        self._with_trash = value
-
     def __init__(self, model, cell):
         """Create a new trash object
 
@@ -578,7 +692,8 @@ class TrashAgent(FixedAgent):
         """
         super().__init__(model)
         self.cell=cell
-        self._with_trash = True
+        self.with_trash = True
+        model.trash_mask[cell.coordinate] = True
 
 class Station(FixedAgent):
     """
@@ -587,6 +702,7 @@ class Station(FixedAgent):
     def __init__(self, model, cell):
         super().__init__(model)
         self.cell=cell
+        model.station_mask[cell.coordinate] = True
 
     def step(self):
         pass
@@ -598,6 +714,7 @@ class ObstacleAgent(FixedAgent):
     def __init__(self, model, cell):
         super().__init__(model)
         self.cell=cell
+        model.obstacle_mask[cell.coordinate] = True
 
     def step(self):
         pass
@@ -609,16 +726,6 @@ class Ground(FixedAgent):
     Attributes:
         explored: Boolean indicating if the cell has been explored
     """
-    @property
-    def explored(self):
-        """Whether the cell has been explored."""
-        return self._explored
-
-    @explored.setter
-    def explored(self, value: bool) -> None:
-        """Set explored state."""
-        self._explored = value
-
     def __init__(self, model, cell):
         """Create a new ground object
 
@@ -628,4 +735,4 @@ class Ground(FixedAgent):
         """
         super().__init__(model)
         self.cell=cell
-        self._explored = False
\ No newline at end of file
+        self.explored = False
\ No newline at end of file
@@ -5,20 +5,41 @@ Diego Córdova Rodríguez, A01781166
 2025-11-24
 """
 
+import numpy as np
+from scipy.sparse import csr_matrix
 from mesa import Model
 from mesa.discrete_space import OrthogonalMooreGrid
 from mesa.datacollection import DataCollector
 
 from .agent import Roomba, ObstacleAgent, TrashAgent, Station, Ground
 
+# (dx, dy) offsets of the 8 Moore neighbors, in the grid's neighborhood order
+MOORE_OFFSETS = tuple((dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if (dx, dy) != (0, 0))
+
+def spread_bits(n):
+    """Move bit i of n to bit 2i (up to 16 bits)."""
+    n &= 0x0000FFFF
+    n = (n | (n << 8)) & 0x00FF00FF
+    n = (n | (n << 4)) & 0x0F0F0F0F
+    n = (n | (n << 2)) & 0x33333333
+    n = (n | (n << 1)) & 0x55555555
+    return n
+
+def morton_encode(coordinate):
+    """Interleave the bits of x and y (Z-order), so nearby cells get nearby codes."""
+    x, y = coordinate
+    return spread_bits(x) | (spread_bits(y) << 1)
+
 class RandomModel(Model):
     """
     Creates a new model with random agents.
     Args:
         num_agents: Number of agents in the simulation
         height, width: The size of the grid to model
+        spatial_order: Step agents in Morton (Z-order) of their cells
+            instead of a random order, so neighboring agents run together
     """
-    def __init__(self, num_agents=1, rate_obstacles=0.1, rate_trash=0.2, max_steps=1000, width=8, height=8, seed=42):
+    def __init__(self, num_agents=1, rate_obstacles=0.1, rate_trash=0.2, max_steps=1000, width=8, height=8, seed=42, spatial_order=False):
 
         super().__init__(seed=seed)
 
@@ -28,33 +49,62 @@ class RandomModel(Model):
         self.num_trash = int(rate_trash * (width - 2) * (height - 2)) # % of inner cells
         self.max_steps = max_steps
         self.seed = seed
+        self.spatial_order = spatial_order
         self.width = width
         self.height = height
 
         # Initialize grid
         self.grid = OrthogonalMooreGrid([width, height], torus=False)
 
+        # Neighbor coordinates of every cell, the grid never changes
+        self.neighbor_coords = {
+            (x, y): tuple(
+                (x + dx, y + dy) for dx, dy in MOORE_OFFSETS
+                if 0 <= x + dx < width and 0 <= y + dy < height
+            )
+            for x in range(width) for y in range(height)
+        }
+
+        # Same neighbors by node index (x * height + y), for the A* search
+        self.neighbor_indices = [
+            tuple(nx * height + ny for nx, ny in self.neighbor_coords[x, y])
+            for x in range(width) for y in range(height)
+        ]
+
+        # Cells with obstacles, trash and stations, indexed by [x, y]
+        # Updated when obstacles, trash and stations are placed or cleaned
+        self.obstacle_mask = np.zeros((width, height), dtype=bool)
+        self.trash_mask = np.zeros((width, height), dtype=bool)
+        self.station_mask = np.zeros((width, height), dtype=bool)
+
+        # Roombas on each cell, in arrival order, updated when they move
+        self.roomba_positions = {}
+
+        # Roomba recharging at each station cell, updated when they start and stop
+        self.recharging_at = {}
+
         # Setup data collection
         model_reporters = {
             "Time (Steps)": lambda m: m.steps,
-            "Total Trash Collected %": lambda m: (m.num_trash - len(m.agents_by_type[TrashAgent])) / m.num_trash * 100 if m.num_trash > 0 else 100,
-            "Roombas Alive": lambda m: len([agent for agent in m.agents_by_type[Roomba] if agent.battery > 0]),
-            "Average Battery %": lambda m: sum(agent.battery for agent in m.agents_by_type[Roomba]) / m.num_agents if m.num_agents > 0 else 0,
-            "Average Movements": lambda m: sum(agent.steps for agent in m.agents_by_type[Roomba]) / m.num_agents if m.num_agents > 0 else 0,
-            "Average Recharges": lambda m: sum(agent.recharges for agent in m.agents_by_type[Roomba]) / m.num_agents if m.num_agents > 0 else 0,
+            "Total Trash Collected %": lambda m: (m.num_trash - m.remaining_trash) / m.num_trash * 100 if m.num_trash > 0 else 100,
+            "Roombas Alive": lambda m: m._metrics["alive"],
+            "Average Battery %": lambda m: m._metrics["battery"] / m.num_agents if m.num_agents > 0 else 0,
+            "Average Movements": lambda m: m._metrics["steps"] / m.num_agents if m.num_agents > 0 else 0,
+            "Average Recharges": lambda m: m._metrics["recharges"] / m.num_agents if m.num_agents > 0 else 0,
         }
         self.datacollector = DataCollector(model_reporters)
 
-        # Identify the coordinates of the border of the grid
-        border = [(x,y)
-                  for y in range(height)
-                  for x in range(width)
-                  if y in [0, height-1] or x in [0, width - 1]]
+        # Coordinates of the border of the grid, column by column:
+        # the whole first and last columns, and the ends of the others
+        border = (
+            (x, y)
+            for x in range(width)
+            for y in (range(height) if x in (0, width - 1) else (0, height - 1))
+        )
 
         # Create the border cells
-        for _, cell in enumerate(self.grid):
-            if cell.coordinate in border:
-                ObstacleAgent(self, cell=cell)
+        for coord in border:
+            ObstacleAgent(self, cell=self.grid[coord])
 
         # Create stations and roombas
         roomba_cells = self.random.choices(self.grid.empties.cells, k=self.num_agents)
@@ -62,18 +112,41 @@ class RandomModel(Model):
             Station(self, cell=cell)
             Roomba(self, cell=cell)
 
+        # Pick random positions for obstacles and trash at once
+        # Sampling without replacement keeps them in different cells
+        empty_cells = self.grid.empties.cells
+        self.num_obstacles = min(self.num_obstacles, len(empty_cells))
+        self.num_trash = min(self.num_trash, len(empty_cells) - self.num_obstacles)
+        self.remaining_trash = self.num_trash # Decreased by roombas when cleaning
+        positions = self.rng.choice(
+            len(empty_cells), size=self.num_obstacles + self.num_trash, replace=False
+        )
+
         # Add obstacles at random positions
         ObstacleAgent.create_agents(
             self,
             self.num_obstacles,
-            cell=self.random.choices(self.grid.empties.cells, k=self.num_obstacles)
+            cell=[empty_cells[i] for i in positions[:self.num_obstacles]]
         )
 
         # Add trash at random positions
         TrashAgent.create_agents(
             self,
             self.num_trash,
-            cell=self.random.choices(self.grid.empties.cells, k=self.num_trash)
+            cell=[empty_cells[i] for i in positions[self.num_obstacles:]]
+        )
+
+        # Graph of obstacle-free cells for shortest path searches
+        # Cell (x, y) is node x * height + y, joined to its free neighbors
+        # Obstacles never move, so it is built only once
+        edges = [
+            (x * height + y, nx * height + ny)
+            for (x, y), neighbors in self.neighbor_coords.items() if not self.obstacle_mask[x, y]
+            for nx, ny in neighbors if not self.obstacle_mask[nx, ny]
+        ]
+        rows, cols = zip(*edges) if edges else ((), ())
+        self.graph = csr_matrix(
+            (np.ones(len(edges)), (rows, cols)), shape=(width * height, width * height)
         )
 
         # Create ground for all cells
@@ -82,8 +155,20 @@ class RandomModel(Model):
 
         # Collect initial data
         self.running = True
+        self._update_metrics()
         self.datacollector.collect(self)
 
+    def _update_metrics(self):
+        '''Sum the roomba values used by the reporters in a single pass.'''
+        alive = battery = steps = recharges = 0
+        for agent in self.agents_by_type[Roomba]:
+            if agent.battery > 0:
+                alive += 1
+            battery += agent.battery
+            steps += agent.steps
+            recharges += agent.recharges
+        self._metrics = {"alive": alive, "battery": battery, "steps": steps, "recharges": recharges}
+
     def step(self):
         '''Advance the model by one step.'''
 
@@ -92,26 +177,30 @@ class RandomModel(Model):
             return
         
         # Perform a step for all agents
-        self.agents.shuffle_do("step")
+        # Only roombas do something on their step, so only they are sorted
+        if self.spatial_order:
+            self.agents_by_type[Roomba].sort(key=lambda a: morton_encode(a.cell.coordinate), ascending=True).do("step")
+        else:
+            self.agents.shuffle_do("step")
 
         # Collect data
+        self._update_metrics()
         self.datacollector.collect(self)
 
         # Stop the model if all trash is collected
-        if len(self.agents_by_type[TrashAgent]) == 0 or self.steps >= int(self.max_steps):
+        if self.remaining_trash == 0 or self.steps >= int(self.max_steps):
             self.running = False
 
             # Only print the last step
-            # df gets the data collected from the model
-            df = self.datacollector.get_model_vars_dataframe()
-            last_row = df.tail(1).iloc[0]
+            # Read the last value of every reporter (no DataFrame needed)
+            last_row = {col: values[-1] for col, values in self.datacollector.model_vars.items()}
 
             print() # Skip line
             print("----------------------- Simulation Results -----------------------")
 
             # Print the last row of data collected
-            for col in df.columns:
-                print(f"{col}: {last_row[col]}")
+            for col, value in last_row.items():
+                print(f"{col}: {value}")
 
             print("------------------------ Roomba Details --------------------------")
 